@@ -2,19 +2,23 @@
 FastAPI application for document processing
 """
 
-import io
+import os
 import base64
 import time
-from typing import List, Union
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Union
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import numpy as np
-from PIL import Image
 import cv2
 
 from .processor import DocumentProcessor
+from .utils import decode_image
 
 
 class ProcessResponse(BaseModel):
@@ -59,44 +63,94 @@ app.add_middleware(
 )
 
 
-def image_to_base64(image: np.ndarray) -> str:
-    """Convert numpy array to base64 string"""
-    # Convert BGR to RGB if needed
-    if len(image.shape) == 3 and image.shape[2] == 3:
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    else:
-        image_rgb = image
+# Each pool worker holds its own processor (built by _init_worker), reused across requests
+_PROCESSOR: Optional[DocumentProcessor] = None
+
+# Worker processes for CPU-bound image processing, created on first use
+_EXECUTOR: Optional[ProcessPoolExecutor] = None
+
+
+def get_processor() -> DocumentProcessor:
+    """Return this process's shared DocumentProcessor, creating it if needed"""
+    global _PROCESSOR
+    if _PROCESSOR is None:
+        _PROCESSOR = DocumentProcessor(debug=False)
+    return _PROCESSOR
+
+
+def _init_worker() -> None:
+    """Build the worker's DocumentProcessor up front instead of on its first job"""
+    get_processor()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared process pool used for image processing"""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        # Spawn workers rather than forking the threaded server process
+        _EXECUTOR = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 8),
+                                        mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker)
+    return _EXECUTOR
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next request starts a fresh one"""
+    global _EXECUTOR
+    # Concurrent failures may already have replaced it; only drop the broken one
+    if _EXECUTOR is executor:
+        _EXECUTOR = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_in_pool(filename: Optional[str], contents: bytes) -> tuple:
+    """Process file contents on the worker pool, recovering if a worker died"""
+    loop = asyncio.get_running_loop()
     
-    # Convert to PIL Image
-    pil_image = Image.fromarray(image_rgb)
+    # A killed worker (e.g. out of memory) breaks the whole pool; replace it and
+    # retry once, since the crash may have been caused by a different file
+    for _ in range(2):
+        executor = get_executor()
+        try:
+            return await loop.run_in_executor(executor, process_uploaded_file, filename, contents)
+        except BrokenProcessPool:
+            _discard_executor(executor)
     
-    # Convert to base64
-    buffer = io.BytesIO()
-    pil_image.save(buffer, format='JPEG', quality=95)
-    img_bytes = buffer.getvalue()
+    return None, "Worker process terminated unexpectedly"
+
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    """Stop the worker processes when the application shuts down"""
+    global _EXECUTOR
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+        _EXECUTOR = None
+
+
+def image_to_base64(image: np.ndarray) -> str:
+    """Convert numpy array to base64 string"""
+    # Encode the BGR buffer straight to JPEG; no RGB conversion or PIL round trip
+    _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 95])
     
-    return base64.b64encode(img_bytes).decode('utf-8')
+    return base64.b64encode(buffer.data).decode('ascii')
 
 
-def process_uploaded_file(file: UploadFile) -> tuple:
-    """Process an uploaded file and return results"""
+def process_uploaded_file(filename: Optional[str], contents: bytes) -> tuple:
+    """Process the contents of an uploaded file and return results"""
     start_time = time.time()
     
     try:
-        # Read file contents
-        contents = file.file.read()
-        
-        # Convert to numpy array
-        nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Decode to a BGR array (libjpeg-turbo for JPEGs when available)
+        image = decode_image(contents)
         
         if image is None:
-            raise ValueError(f"Could not decode image: {file.filename}")
+            raise ValueError(f"Could not decode image: {filename}")
         
         original_size = image.shape[:2]
         
         # Process the image
-        processor = DocumentProcessor(debug=False)
+        processor = get_processor()
         rotation_angle, processed_image = processor.process(image)
         
         # Convert to base64
@@ -141,7 +195,9 @@ async def process_document(file: UploadFile = File(..., description="Document im
             detail="File must be an image (JPG, JPEG, PNG)"
         )
     
-    result, error = process_uploaded_file(file)
+    # Read asynchronously and process off the event loop
+    contents = await file.read()
+    result, error = await run_in_pool(file.filename, contents)
     
     if error:
         raise HTTPException(status_code=400, detail=f"Processing failed: {error}")
@@ -168,13 +224,17 @@ async def process_documents_batch(files: List[UploadFile] = File(..., descriptio
     failed_files = []
     processed_count = 0
     
-    for file in files:
+    async def process_file(file: UploadFile) -> tuple:
         if not file.content_type or not file.content_type.startswith('image/'):
-            failed_files.append(f"{file.filename}: Not an image file")
-            continue
-        
-        result, error = process_uploaded_file(file)
+            return None, "Not an image file"
         
+        contents = await file.read()
+        return await run_in_pool(file.filename, contents)
+    
+    # Files are processed in parallel across the worker processes
+    outcomes = await asyncio.gather(*(process_file(file) for file in files))
+    
+    for file, (result, error) in zip(files, outcomes):
         if error:
             failed_files.append(f"{file.filename}: {error}")
         else:
@@ -3,20 +3,55 @@
 Command-line interface for the document processor.
 """
 
+import os
 import argparse
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 import numpy as np
 
 from .processor import process_document_image
 
 
+def _process_file(img_path: Path, output_dir: Path) -> Tuple[float, float]:
+    """Process one image of a directory batch, returning (angle, elapsed ms)"""
+    start = time.time()
+    output_path = output_dir / f"processed_{img_path.name}"
+    angle, _ = process_document_image(img_path, 'ndarray', output_path, False)
+    return angle, (time.time() - start) * 1000
+
+
+def _iter_results(images: List[Path], output_dir: Path,
+                  jobs: int) -> Iterator[Tuple[Path, Optional[Tuple[float, float]], Optional[Exception]]]:
+    """Yield (image, result, error) for each image as it finishes processing"""
+    if jobs == 1:
+        # Sequential path, useful for debugging
+        for img_path in images:
+            try:
+                yield img_path, _process_file(img_path, output_dir), None
+            except Exception as e:
+                yield img_path, None, e
+        return
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(_process_file, img_path, output_dir): img_path
+                   for img_path in images}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+
 def main():
     parser = argparse.ArgumentParser(description="Fixed Document Processor")
     parser.add_argument("input", help="Input image or directory")
     parser.add_argument("-o", "--output", help="Output directory")
     parser.add_argument("-f", "--format", choices=['ndarray', 'base64'], default='ndarray')
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Parallel worker processes for directories (default: CPU count, 1 = sequential)")
     
     args = parser.parse_args()
     input_path = Path(args.input)
@@ -62,23 +97,19 @@ def main():
         failed = 0
         times = []
         
-        for i, img_path in enumerate(images, 1):
-            try:
-                output_path = output_dir / f"processed_{img_path.name}"
-                
-                start = time.time()
-                angle, _ = process_document_image(img_path, 'ndarray', output_path, False)
-                elapsed = (time.time() - start) * 1000
-                
+        jobs = max(1, args.jobs or os.cpu_count() or 1)
+        
+        for i, (img_path, result, error) in enumerate(_iter_results(images, output_dir, jobs), 1):
+            if error is None:
+                angle, elapsed = result
                 times.append(elapsed)
                 successful += 1
                 
                 print(f"[{i:2d}/{len(images)}] {img_path.name:30s} "
                       f"{angle:+6.2f}° {elapsed:5.0f}ms ✓")
-                
-            except Exception as e:
+            else:
                 failed += 1
-                print(f"[{i:2d}/{len(images)}] {img_path.name:30s} ERROR: {str(e)[:50]}")
+                print(f"[{i:2d}/{len(images)}] {img_path.name:30s} ERROR: {str(error)[:50]}")
         
         # Final summary
         print(f"\n{'='*70}")
@@ -2,42 +2,58 @@
 Document boundary detection using advanced OpenCV pipeline.
 """
 
+import math
 import cv2
 import numpy as np
-from typing import Optional
+from typing import Optional, Tuple
+
+from ..preprocessing import to_grayscale
+
+
+# Longest image side used for edge/contour detection; the perspective warp
+# still reads the full-resolution image
+DETECTION_MAX_SIDE = 1280
+
+# Structuring element for closing gaps in edge maps, built once
+_KERN_RECT5 = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+
+# Binomial taps of two chained 5x5 Gaussian passes (sigma = sqrt(2)), applied once
+_GAUSS9 = np.array([1, 8, 28, 56, 70, 56, 28, 8, 1], dtype=np.float32) / 256
 
 
 def order_points(pts):
     """Order points in clockwise order: top-left, top-right, bottom-right, bottom-left"""
-    rect = np.zeros((4, 2), dtype="float32")
+    pts = np.asarray(pts, dtype="float32").reshape(4, 2)
+    
+    # Only 4 points, so plain Python beats the per-call overhead of NumPy reductions
+    coords = pts.tolist()
     
     # Sum and difference to find corners
-    s = pts.sum(axis=1)
-    diff = np.diff(pts, axis=1)
+    s = [x + y for x, y in coords]
+    diff = [y - x for x, y in coords]
     
     # Top-left has smallest sum, bottom-right has largest sum
-    rect[0] = pts[np.argmin(s)]  # top-left
-    rect[2] = pts[np.argmax(s)]  # bottom-right
-    
     # Top-right has smallest difference, bottom-left has largest difference
-    rect[1] = pts[np.argmin(diff)]  # top-right
-    rect[3] = pts[np.argmax(diff)]  # bottom-left
-    
-    return rect
+    return pts[[
+        min(range(4), key=s.__getitem__),     # top-left
+        min(range(4), key=diff.__getitem__),  # top-right
+        max(range(4), key=s.__getitem__),     # bottom-right
+        max(range(4), key=diff.__getitem__)   # bottom-left
+    ]]
 
 
 def four_point_transform(image, pts):
     """Apply perspective transformation to get bird's eye view"""
     rect = order_points(pts)
-    (tl, tr, br, bl) = rect
+    (tl, tr, br, bl) = rect.tolist()
     
     # Compute width and height of new image
-    widthA = np.sqrt(((br[0] - bl[0]) ** 2) + ((br[1] - bl[1]) ** 2))
-    widthB = np.sqrt(((tr[0] - tl[0]) ** 2) + ((tr[1] - tl[1]) ** 2))
+    widthA = math.hypot(br[0] - bl[0], br[1] - bl[1])
+    widthB = math.hypot(tr[0] - tl[0], tr[1] - tl[1])
     maxWidth = max(int(widthA), int(widthB))
     
-    heightA = np.sqrt(((tr[0] - br[0]) ** 2) + ((tr[1] - br[1]) ** 2))
-    heightB = np.sqrt(((tl[0] - bl[0]) ** 2) + ((tl[1] - bl[1]) ** 2))
+    heightA = math.hypot(tr[0] - br[0], tr[1] - br[1])
+    heightB = math.hypot(tl[0] - bl[0], tl[1] - bl[1])
     maxHeight = max(int(heightA), int(heightB))
     
     # Define destination points for perspective transform
@@ -55,6 +71,65 @@ def four_point_transform(image, pts):
     return warped
 
 
+def _shared_canny(blurred, thresholds):
+    """Run Canny for several threshold pairs on a single set of Sobel gradients"""
+    # Canny computes 3x3 Sobel gradients with replicated borders internally;
+    # computing them once here gives identical edges without redoing the work
+    dx = cv2.Sobel(blurred, cv2.CV_16S, 1, 0, ksize=3, borderType=cv2.BORDER_REPLICATE)
+    dy = cv2.Sobel(blurred, cv2.CV_16S, 0, 1, ksize=3, borderType=cv2.BORDER_REPLICATE)
+    
+    return [cv2.Canny(dx, dy, low, high, L2gradient=False) for low, high in thresholds]
+
+
+def _find_quad(contour, arc_len, lo=0.005, hi=0.05, iters=5):
+    """Binary-search the approxPolyDP epsilon (as a fraction of arc length) for a 4-vertex polygon"""
+    for _ in range(iters):
+        mid = (lo + hi) / 2
+        approx = cv2.approxPolyDP(contour, mid * arc_len, True)
+        
+        # Vertex count shrinks as epsilon grows
+        if len(approx) > 4:
+            lo = mid
+        elif len(approx) < 4:
+            hi = mid
+        else:
+            return approx
+    
+    return None
+
+
+def _score_quad(area, hull_area, x, y, w_rect, h_rect, img_w, img_h, inv_image_area, border_thresh):
+    """Score a candidate quadrilateral and check it against the document thresholds"""
+    rectangularity = area / hull_area if hull_area > 0 else 0
+    
+    bounding_area = w_rect * h_rect
+    filling_ratio = area / bounding_area if bounding_area > 0 else 0
+    
+    # Calculate aspect ratio (should be reasonable for documents)
+    aspect_ratio = min(w_rect/h_rect, h_rect/w_rect) if h_rect > 0 and w_rect > 0 else 0
+    
+    # Check if it's not too close to image borders (likely not a document edge)
+    border_distance = min(x, y, img_w - (x + w_rect), img_h - (y + h_rect))
+    border_penalty = 1.0 if border_distance > border_thresh else 0.5
+    
+    # Combined score with area normalization
+    area_score = area * inv_image_area  # Normalize by image size
+    score = (area_score * rectangularity * filling_ratio * aspect_ratio * border_penalty * 1000000)
+    
+    passes = (rectangularity > 0.75 and 
+              filling_ratio > 0.7 and 
+              aspect_ratio > 0.3 and
+              area_score > 0.15)  # At least 15% of image
+    
+    # Near-perfect large rectangle: no later candidate is worth checking
+    clear_winner = (passes and
+                    rectangularity > 0.92 and
+                    filling_ratio > 0.9 and
+                    area_score > 0.4)
+    
+    return score, passes, clear_winner
+
+
 class DocumentDetector:
     """Advanced document detector using new OpenCV pipeline"""
     
@@ -65,18 +140,23 @@ class DocumentDetector:
         """Legacy method for backward compatibility"""
         return self.detect_advanced(image, gray)
     
-    def detect_advanced(self, image: np.ndarray, gray: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
-        """Advanced document detection using OpenCV pipeline"""
-        original = image.copy()
-        h, w = image.shape[:2]
+    def _find_quad_at_scale(self, gray: np.ndarray, scale: float,
+                            edge_preserving: bool) -> Tuple[Optional[np.ndarray], float]:
+        """Search a detection-scale grayscale image for the best document quad"""
+        h, w = gray.shape[:2]
         image_area = h * w
         
-        # Convert to grayscale if not provided
-        if gray is None:
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image.copy()
+        # Denoise at detection scale; the filter is chosen here rather than in
+        # enhanced_preprocess because it also fixes Canny's pre-blur. The 9-tap
+        # binomial (two 5x5 Gaussian passes) feeds both adaptive thresholding
+        # and Canny; the median output gets a separate 5x5 blur for Canny
+        if edge_preserving:
+            # Median filter suppresses background texture while preserving edges
+            gray = cv2.medianBlur(gray, 5)
+            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        else:
+            gray = cv2.sepFilter2D(gray, -1, _GAUSS9, _GAUSS9)
+            blurred = gray
         
         # Step 1: Try adaptive thresholding approach for documents
         adaptive_thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
@@ -84,24 +164,31 @@ class DocumentDetector:
         # Step 2: Multiple edge detection approaches with better parameters
         edges_list = []
         
-        # Apply Gaussian blur first
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        
-        # Canny with different parameters - more conservative
-        edges1 = cv2.Canny(blurred, 50, 150, apertureSize=3)
-        edges2 = cv2.Canny(blurred, 75, 225, apertureSize=3)
+        # Canny with different parameters - more conservative (shared gradients)
+        edges1, edges2 = _shared_canny(blurred, [(50, 150), (75, 225)])
         edges3 = cv2.Canny(adaptive_thresh, 50, 150, apertureSize=3)
         
-        edges_list = [edges1, edges2, edges3]
+        # Union the edge maps so morphology and contour tracing run once;
+        # the stricter edges2 map is only tried if the union yields nothing
+        combined = cv2.bitwise_or(cv2.bitwise_or(edges1, edges2), edges3)
+        edges_list = [combined, edges2]
         
         # Step 3: Find contours and score them better
         best_contour = None
         best_score = 0
         
+        # Loop invariants: area limits and border margin at detection scale
+        min_area = max(20000 * scale * scale, image_area * 0.1)  # At least 10% of image
+        max_area = image_area * 0.9  # At most 90% of image
+        inv_image_area = 1.0 / image_area
+        border_thresh = 20 * scale
+        
         for i, edges in enumerate(edges_list):
+            if best_contour is not None:
+                break
+            
             # Dilate and erode to close gaps
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-            closed = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel, iterations=2)
+            closed = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, _KERN_RECT5, iterations=2)
             
             # Find contours
             contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -116,61 +203,34 @@ class DocumentDetector:
             for j, contour in enumerate(contours[:8]):  # Check more contours
                 area = cv2.contourArea(contour)
                 
-                # More flexible area threshold based on image size
-                min_area = max(20000, image_area * 0.1)  # At least 10% of image
-                max_area = image_area * 0.9  # At most 90% of image
-                
                 if area < min_area or area > max_area:
                     continue
                     
-                # Try multiple epsilon values
-                best_approx = None
-                for eps_factor in [0.01, 0.015, 0.02, 0.025, 0.03, 0.04]:
-                    epsilon = eps_factor * cv2.arcLength(contour, True)
-                    approx = cv2.approxPolyDP(contour, epsilon, True)
-                    
-                    if len(approx) == 4:
-                        best_approx = approx
-                        break
+                # Search for an epsilon that yields a quadrilateral
+                best_approx = _find_quad(contour, cv2.arcLength(contour, True))
                 
-                if best_approx is not None and len(best_approx) == 4:
+                if best_approx is not None:
                     # Calculate better scoring
                     hull = cv2.convexHull(contour)
                     hull_area = cv2.contourArea(hull)
-                    rectangularity = area / hull_area if hull_area > 0 else 0
                     
                     # Get the bounding rectangle
                     x, y, w_rect, h_rect = cv2.boundingRect(best_approx)
-                    bounding_area = w_rect * h_rect
-                    filling_ratio = area / bounding_area if bounding_area > 0 else 0
-                    
-                    # Calculate aspect ratio (should be reasonable for documents)
-                    aspect_ratio = min(w_rect/h_rect, h_rect/w_rect) if h_rect > 0 and w_rect > 0 else 0
                     
-                    # Check if it's not too close to image borders (likely not a document edge)
-                    border_distance = min(x, y, w - (x + w_rect), h - (y + h_rect))
-                    border_penalty = 1.0 if border_distance > 20 else 0.5
+                    score, passes, clear_winner = _score_quad(area, hull_area, x, y, w_rect, h_rect, w, h,
+                                                              inv_image_area, border_thresh)
                     
-                    # Combined score with area normalization
-                    area_score = area / image_area  # Normalize by image size
-                    score = (area_score * rectangularity * filling_ratio * aspect_ratio * border_penalty * 1000000)
-                    
-                    # Better thresholds
-                    if (score > best_score and 
-                        rectangularity > 0.75 and 
-                        filling_ratio > 0.7 and 
-                        aspect_ratio > 0.3 and
-                        area_score > 0.15):  # At least 15% of image
-                        
+                    if passes and score > best_score:
                         best_score = score
                         best_contour = best_approx
+                        
+                        if clear_winner:
+                            break
         
-        # Step 4: If no good contour found, don't crop (return None)
-        # This prevents bad cropping like we saw with Canada.jpg
         if best_contour is None:
             if self.debug:
                 print("No suitable document contour found")
-            return None
+            return None, 0
         
         # Step 5: Final validation - make sure the contour makes sense
         if best_contour is not None:
@@ -181,19 +241,54 @@ class DocumentDetector:
             if detected_area < image_area * 0.15:  # Less than 15% of image
                 if self.debug:
                     print(f"Detected area too small: {detected_area/image_area:.1%} of image")
-                return None
+                return None, 0
+        
+        return best_contour, best_score
+    
+    def detect_advanced(self, image: np.ndarray, gray: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Advanced document detection using OpenCV pipeline
+        
+        gray is the unfiltered grayscale image; it is downscaled once and searched
+        with the cheap filter first, then with the edge-preserving one.
+        """
+        original = image  # Only read (warp input); the debug overlay makes its own copy
+        h, w = image.shape[:2]
+        
+        # Convert to grayscale if not provided
+        gray = to_grayscale(image) if gray is None else gray
+        
+        # Run detection on a bounded-size image; corners are scaled back later
+        scale = min(1.0, DETECTION_MAX_SIDE / max(h, w))
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        # Textured backgrounds can swamp the cheap edge map; retry the same
+        # downscaled image with the edge-preserving filter before giving up
+        best_contour, best_score = self._find_quad_at_scale(gray, scale, edge_preserving=False)
+        if best_contour is None:
+            if self.debug:
+                print("Retrying document detection with edge-preserving filter")
+            best_contour, best_score = self._find_quad_at_scale(gray, scale, edge_preserving=True)
+        
+        # Step 4: If no good contour found, don't crop (return None)
+        # This prevents bad cropping like we saw with Canada.jpg
+        if best_contour is None:
+            return None
+        
+        # Corners as a (4, 2) float32 array, mapped back to full resolution
+        best_contour = best_contour.reshape(4, 2).astype(np.float32)
+        if scale < 1.0:
+            best_contour /= scale
         
         if self.debug and best_contour is not None:
             print(f"Document detected with score: {best_score}")
             debug_img = original.copy()
-            cv2.drawContours(debug_img, [best_contour], -1, (0, 255, 0), 3)
+            cv2.drawContours(debug_img, [best_contour.astype(np.int32)], -1, (0, 255, 0), 3)
             # Note: In production, you might want to save this debug image
         
         # Apply perspective transformation to get the cropped document
         if best_contour is not None:
-            if len(best_contour.shape) == 3:
-                best_contour = best_contour.reshape(4, 2)
-            
             # Apply perspective transformation
             warped = four_point_transform(original, best_contour)
             return warped
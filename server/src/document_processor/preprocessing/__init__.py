@@ -2,9 +2,10 @@
 Image preprocessing utilities for document processing.
 """
 
-from .enhance import enhanced_preprocess, enhance_final_result, minimal_process, is_unusable_quality
+from .enhance import to_grayscale, enhanced_preprocess, enhance_final_result, minimal_process, is_unusable_quality
 
 __all__ = [
+    "to_grayscale",
     "enhanced_preprocess", 
     "enhance_final_result",
     "minimal_process",
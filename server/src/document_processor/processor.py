@@ -3,12 +3,14 @@
 Main Document Processor - Orchestrates all processing components using new logic
 """
 
+import os
 import time
 import numpy as np
-from typing import Tuple, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Optional, Union
 from pathlib import Path
 
-from .preprocessing import enhanced_preprocess
+from .preprocessing import to_grayscale
 from .detection import DocumentDetector
 from .rotation import RotationDetector, RotationCorrector
 from .utils import load_image, save_image, format_output
@@ -38,25 +40,21 @@ class DocumentProcessor:
         if self.debug:
             print(f"Original image size: {original_shape}")
         
-        # Step 1: Preprocess image
-        gray = enhanced_preprocess(image)
+        # Step 1: Grayscale once; shared by detection (which smooths it at its
+        # own working scale) and full-image skew estimation
+        gray = to_grayscale(image)
         
-        # Step 2: ALWAYS detect skew angle on full image first (new approach)
-        full_image_angle = self.rotation_detector.detect_full_image_angle(image)
-        if self.debug:
-            print(f"Full image skew angle: {full_image_angle:.3f}°")
-        
-        # Step 3: Try to detect and crop document (using new advanced detection)
+        # Step 2: Try to detect and crop document (using new advanced detection)
         cropped_document = self.detector.detect_advanced(image, gray)
         
         if cropped_document is not None:
             if self.debug:
                 print(f"Cropped document size: {cropped_document.shape[:2]}")
             
-            # Step 4: Detect rotation angle on the CROPPED document
+            # Step 3: Detect rotation angle on the CROPPED document
             cropped_angle = self.rotation_detector.detect_cropped_angle(cropped_document)
             
-            # Step 5: Apply deskewing to cropped document
+            # Step 4: Apply deskewing to cropped document
             corrected_document = self.rotation_corrector.deskew_document(cropped_document, cropped_angle)
             final_angle = cropped_angle
             
@@ -67,6 +65,11 @@ class DocumentProcessor:
             if self.debug:
                 print("Could not detect document boundaries - deskewing full image")
             
+            # The full-image angle is only needed here, so it is computed lazily
+            full_image_angle = self.rotation_detector.detect_full_image_angle(image, gray)
+            if self.debug:
+                print(f"Full image skew angle: {full_image_angle:.3f}°")
+            
             corrected_document = self.rotation_corrector.deskew_document(image, full_image_angle)
             final_angle = full_image_angle
             
@@ -81,6 +84,21 @@ class DocumentProcessor:
             print("-" * 60)
         
         return final_angle, corrected_document
+    
+    def process_batch(self, images: List[np.ndarray],
+                      max_workers: Optional[int] = None) -> List[Tuple[float, np.ndarray]]:
+        """
+        Process several document images concurrently, preserving input order
+        
+        OpenCV releases the GIL in its heavy calls, so threads overlap the work
+        of independent images.
+        """
+        if not images:
+            return []
+        
+        max_workers = max_workers or min(len(images), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.process, images))
 
 
 def process_document_image(image_path: Union[str, Path], 
@@ -4,8 +4,24 @@ Document rotation angle detection using jdeskew library.
 
 import cv2
 import numpy as np
+from typing import Optional
 from jdeskew.estimator import get_angle
 
+from ..preprocessing import to_grayscale
+
+
+# Longest side used for skew estimation; skew is a low-frequency property,
+# so larger inputs are downscaled before the FFT-based estimator
+ANGLE_MAX_SIDE = 1500
+
+
+def _downscale_for_angle(gray: np.ndarray) -> np.ndarray:
+    """Shrink a grayscale image so its longest side is at most ANGLE_MAX_SIDE"""
+    scale = max(gray.shape[:2]) / ANGLE_MAX_SIDE
+    if scale > 1.0:
+        gray = cv2.resize(gray, None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA)
+    return gray
+
 
 class RotationDetector:
     """Detect document rotation angle using jdeskew"""
@@ -17,21 +33,18 @@ class RotationDetector:
         """Legacy method for backward compatibility"""
         return self.detect_cropped_angle(document)
     
-    def detect_full_image_angle(self, image: np.ndarray) -> float:
+    def detect_full_image_angle(self, image: np.ndarray, gray: Optional[np.ndarray] = None) -> float:
         """
         Detect rotation angle of the full image using jdeskew
         """
         if image is None or image.size == 0:
             return 0.0
         
-        # Convert to grayscale if needed
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        # Convert to grayscale if needed (callers may pass one they already have)
+        gray = to_grayscale(image) if gray is None else gray
         
         try:
-            angle = get_angle(gray)
+            angle = get_angle(_downscale_for_angle(gray))
             if self.debug:
                 print(f"Full image skew angle detected: {angle:.3f}°")
             return angle
@@ -40,21 +53,18 @@ class RotationDetector:
                 print(f"Error detecting full image angle: {e}")
             return 0.0
     
-    def detect_cropped_angle(self, document: np.ndarray) -> float:
+    def detect_cropped_angle(self, document: np.ndarray, gray: Optional[np.ndarray] = None) -> float:
         """
         Detect rotation angle of the cropped document using jdeskew
         """
         if document is None or document.size == 0:
             return 0.0
         
-        # Convert to grayscale if needed
-        if len(document.shape) == 3:
-            gray = cv2.cvtColor(document, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = document.copy()
+        # Convert to grayscale if needed (callers may pass one they already have)
+        gray = to_grayscale(document) if gray is None else gray
         
         try:
-            angle = get_angle(gray)
+            angle = get_angle(_downscale_for_angle(gray))
             if self.debug:
                 print(f"Cropped document skew angle detected: {angle:.3f}°")
             return angle
@@ -2,6 +2,6 @@
 Utility functions and helpers for document processing.
 """
 
-from .io import load_image, save_image, format_output
+from .io import load_image, decode_image, save_image, format_output
 
-__all__ = ["load_image", "save_image", "format_output"]
\ No newline at end of file
+__all__ = ["load_image", "decode_image", "save_image", "format_output"]
\ No newline at end of file
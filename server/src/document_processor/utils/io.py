@@ -2,11 +2,32 @@
 Input/Output utilities for document processing.
 """
 
+import io
 import cv2
 import base64
 import numpy as np
 from pathlib import Path
-from typing import Union, Tuple
+from typing import Optional, Union, Tuple
+from PIL import Image
+
+# Optional: decode JPEGs with libjpeg-turbo directly when PyTurboJPEG and the
+# native library are installed; otherwise fall back to cv2.imdecode
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _TURBO_JPEG = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _TURBO_JPEG = None
+
+# EXIF orientation tag -> operations that bring the pixels upright
+_EXIF_ORIENTATION_OPS = {
+    2: lambda img: cv2.flip(img, 1),
+    3: lambda img: cv2.rotate(img, cv2.ROTATE_180),
+    4: lambda img: cv2.flip(img, 0),
+    5: lambda img: cv2.transpose(img),
+    6: lambda img: cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE),
+    7: lambda img: cv2.rotate(cv2.transpose(img), cv2.ROTATE_180),
+    8: lambda img: cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE),
+}
 
 
 def load_image(image_path: Union[str, Path]) -> np.ndarray:
@@ -17,6 +38,31 @@ def load_image(image_path: Union[str, Path]) -> np.ndarray:
     return image
 
 
+def _exif_orientation(contents: bytes) -> int:
+    """Read the EXIF orientation tag from encoded image bytes (header only)"""
+    try:
+        with Image.open(io.BytesIO(contents)) as pil_image:
+            return pil_image.getexif().get(0x0112, 1)
+    except Exception:
+        return 1
+
+
+def decode_image(contents: bytes) -> Optional[np.ndarray]:
+    """Decode encoded image bytes to a BGR array, or None if undecodable"""
+    if _TURBO_JPEG is not None and contents[:3] == b'\xff\xd8\xff':
+        try:
+            image = _TURBO_JPEG.decode(contents, pixel_format=TJPF_BGR)
+        except Exception:
+            image = None
+        
+        if image is not None:
+            # libjpeg-turbo ignores EXIF; match cv2.imdecode, which applies it
+            op = _EXIF_ORIENTATION_OPS.get(_exif_orientation(contents))
+            return op(image) if op else image
+    
+    return cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
+
+
 def save_image(image: np.ndarray, save_path: Union[str, Path]) -> None:
     """Save image to file path"""
     if save_path:
@@ -27,6 +73,6 @@ def format_output(image: np.ndarray, output_format: str) -> Union[np.ndarray, st
     """Format output image according to specified format"""
     if output_format == 'base64':
         _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 95])
-        return base64.b64encode(buffer).decode('utf-8')
+        return base64.b64encode(buffer.data).decode('ascii')
     else:
         return image
\ No newline at end of file